@@ -3,16 +3,26 @@ import sys
 import os
 import datetime
 import sqlite3
-from collections import defaultdict
+import pathlib
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+
+import numpy as np
 
 # For GUI
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QFileDialog, QComboBox, QSplitter, QTabWidget,
-    QTableWidget, QTableWidgetItem, QHeaderView, QCheckBox,
-    QSpinBox, QGroupBox, QFormLayout, QTextEdit, QMessageBox
+    QTableView, QHeaderView, QCheckBox,
+    QSpinBox, QGroupBox, QFormLayout, QTextEdit, QMessageBox, QProgressBar
+)
+from PyQt5.QtCore import (
+    Qt, QSize, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal,
+    QAbstractTableModel, QModelIndex, QSortFilterProxyModel
 )
-from PyQt5.QtCore import Qt, QSize
 from PyQt5.QtGui import QFont, QIcon
 
 # For graphs
@@ -24,16 +34,35 @@ from matplotlib.figure import Figure
 import matplotlib.dates as mdates
 from matplotlib.ticker import MaxNLocator
 
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+BYTES_TO_MB = 1.0 / (1024 * 1024)
+# Longest line drawn on the graphs, longer series are thinned before plotting
+MAX_PLOT_POINTS = 2000
+# Media root markers in priority order, the first one found in a path wins
+MEDIA_INDICATORS = (
+    '/music/', '/audiobooks/', '/audio/', '/media/',
+    '/artists/', '/musica/', '/jazz/', '/rock/', '/electronic/',
+    'music/', 'artists/', 'musica/', 'jazz/', 'albums/'
+)
+# Lowercase prefixes of system/user folders skipped by the heuristic path parser
+SKIP_PREFIXES = ('@@', '!', '#', 'my files', 'downloads', 'shared', 'soulseek', 'main')
+# Artist/album separators, none is a prefix of another so the order does not matter
+ALBUM_SEPARATORS = (' - ', ' – ', ' — ', ': ', ' : ', '_ ', ' _ ', ' | ', ' / ')
+
 def format_size(size_bytes):
     """Format byte size to human readable format"""
     if size_bytes == 0:
         return "0B"
-    size_names = ("B", "KB", "MB", "GB", "TB")
-    i = 0
-    while size_bytes >= 1024 and i < len(size_names) - 1:
-        size_bytes /= 1024
-        i += 1
-    return f"{size_bytes:.2f} {size_names[i]}"
+    # Sizes below 1 KB stay in bytes, along with negative and NaN ones
+    if not size_bytes >= 1024:
+        return f"{size_bytes:.2f} B"
+    if size_bytes >= 1 << 40:
+        # Checked first so an infinite size needs no int conversion
+        i = len(SIZE_UNITS) - 1
+    else:
+        # Each unit is 10 bits wide, so the bit length picks the unit without a loop
+        i = (int(size_bytes).bit_length() - 1) // 10
+    return f"{size_bytes / (1 << (10 * i)):.2f} {SIZE_UNITS[i]}"
 
 def format_time(seconds):
     """Format seconds to human readable time"""
@@ -46,144 +75,269 @@ def format_time(seconds):
         hours = seconds / 3600
         return f"{hours:.2f} hours"
 
-def check_database_format(db_path):
-    """Check if database uses old (text State) or new (integer State + StateDescription) format"""
+def file_extension(filename):
+    """Get the lowercase extension of a transferred file, used to group file types"""
+    if not filename:
+        return ".unknown"
+    # Same result as os.path.splitext without the call and tuple, this runs once per row.
+    # Like splitext, leading dots of the name don't start an extension.
+    dot = filename.rfind('.')
+    start = filename.rfind('/') + 1
+    if dot < start or not filename[start:dot].lstrip('.'):
+        return ".noext"
+    return filename[dot:].lower()
+
+def open_ro(db_path, check_same_thread=True):
+    """Open a read-only database connection tuned for the read-heavy stats queries"""
+    # mode=ro keeps the query connections from writing to the database slskd owns.
+    # The only write, the index from ensure_transfer_indexes, goes through a separate writer.
+    uri = pathlib.Path(db_path).resolve().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=check_same_thread)
+    # Larger page cache, in-memory temp b-trees for GROUP BY and a memory-mapped file.
+    # journal_mode is left alone since it is persistent and belongs to slskd.
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    # Registered once per connection, registering again would reset its statement cache.
+    # file_extension is a pure function of the filename, so it is marked deterministic.
+    conn.create_function("file_extension", 1, file_extension, deterministic=True)
+    return conn
+
+def detect_database_format(conn):
+    """Check if a database uses old (text State) or new (integer State + StateDescription) format"""
+    # Check if StateDescription column exists
+    cursor = conn.execute("PRAGMA table_info(Transfers)")
+    columns = [column[1] for column in cursor.fetchall()]
+    
+    if 'StateDescription' in columns:
+        # New format with StateDescription column
+        return 'new'
+    else:
+        # Old format with text State column
+        return 'old'
+
+# Column holding the transfer state text in each database format
+STATE_COLUMNS = {'new': 'StateDescription', 'old': 'State'}
+
+# Transfer state conditions for each database format, built once at import.
+# Completed states are matched as a prefix range rather than LIKE, so the index can seek to them.
+STATE_CONDITIONS = {
+    db_format: {
+        'completed': f"({column} >= 'Completed' AND {column} < 'Completee')",
+        'error': f"{column}='Completed, Errored'",
+        'success': f"{column}='Completed, Succeeded'",
+    }
+    for db_format, column in STATE_COLUMNS.items()
+}
+
+def cached_connection(conn_cache, db_path):
+    """Get the pooled connection and format for a database, opening it on first use"""
+    entry = conn_cache.get(db_path)
+    if entry is None:
+        # Pooled connections are handed to whichever worker thread scans that database
+        conn = open_ro(db_path, check_same_thread=False)
+        entry = conn_cache[db_path] = (conn, detect_database_format(conn))
+    return entry
+
+@contextmanager
+def stats_connection(db_path, conn_cache=None):
+    """Yield a read-only connection to a database and its format, from conn_cache if one is given"""
+    if conn_cache is None:
+        conn = open_ro(db_path)
+        try:
+            yield conn, detect_database_format(conn)
+        finally:
+            conn.close()
+    else:
+        conn, db_format = cached_connection(conn_cache, db_path)
+        try:
+            yield conn, db_format
+        finally:
+            # Pooled connections stay open for the next analysis, without holding a read lock
+            if conn.in_transaction:
+                conn.rollback()
+
+def close_connections(conn_cache):
+    """Close and forget every pooled connection"""
+    for conn, _ in conn_cache.values():
+        conn.close()
+    conn_cache.clear()
+
+class AnalysisCancelled(Exception):
+    """Raised by the stats queries once the analysis they belong to has been stopped"""
+
+def check_cancelled(cancelled):
+    """Raise AnalysisCancelled if the cancelled event of the running analysis is set"""
+    if cancelled is not None and cancelled.is_set():
+        raise AnalysisCancelled()
+
+def database_signature(db_paths):
+    """Modification times and sizes of the databases and their WAL files, changes whenever slskd writes"""
+    signature = []
+    for db_path in sorted(db_paths):
+        states = []
+        for path in (db_path, db_path + "-wal"):
+            # Sizes catch writes that land within the filesystem's mtime granularity
+            try:
+                st = os.stat(path)
+                states.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                states.append(None)
+        signature.append((db_path, *states))
+    return tuple(signature)
+
+def ensure_transfer_indexes(db_path):
+    """Create the index used by the stats queries if the database allows it"""
     try:
+        # Stats connections are read-only, so the index is built on a short-lived writer
         conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Check if StateDescription column exists
-        cursor.execute("PRAGMA table_info(Transfers)")
-        columns = [column[1] for column in cursor.fetchall()]
-        has_state_description = 'StateDescription' in columns
-        
-        if has_state_description:
-            # New format with StateDescription column
-            conn.close()
-            return 'new'
-        else:
-            # Old format with text State column
-            conn.close()
-            return 'old'
     except sqlite3.Error:
-        return 'old'  # Default to old format if error
+        return
+    try:
+        state_column = STATE_COLUMNS[detect_database_format(conn)]
+        conn.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_transfers_direction_state_requested
+            ON Transfers(Direction, {state_column}, RequestedAt)
+        """)
+        conn.commit()
+    except sqlite3.Error:
+        pass  # Read-only or locked database, queries still work without it
+    finally:
+        conn.close()
 
-def get_transfer_stats(db_paths, direction="Upload", days=None):
-    """Get statistics on transfers from the database(s)"""
-    stats = {
+def empty_transfer_stats():
+    """Create the accumulator that per-database transfer statistics are summed into"""
+    return {
         "total_transfers": 0,
         "total_bytes": 0,
-        "unique_users": set(),
-        "user_stats": defaultdict(lambda: {"count": 0, "bytes": 0}),
-        "extension_stats": defaultdict(lambda: {"count": 0, "bytes": 0}),
-        "speeds": [],
-        "durations": [],
+        # Per-user and per-extension stats are kept as parallel count/bytes maps
+        "user_counts": Counter(),
+        "user_bytes": Counter(),
+        "extension_counts": Counter(),
+        "extension_bytes": Counter(),
+        "speed_sum": 0.0,
+        "speed_count": 0,
+        "duration_sum": 0.0,
+        "duration_count": 0,
         "total_attempts": 0,
         "errors": 0
     }
 
-    date_filter = ""
-    if days:
-        cutoff_date = (datetime.datetime.now() - datetime.timedelta(days=days)).strftime("%Y-%m-%d")
-        date_filter = f" AND RequestedAt >= '{cutoff_date}'"
+def get_database_transfer_stats(db_path, direction, cutoff_date=None, conn_cache=None, errors=None,
+                                cancelled=None):
+    """Get partial statistics on transfers from a single database file, failures are added to errors"""
+    stats = empty_transfer_stats()
 
-    # Process each database file
-    for db_path in db_paths:
-        if not os.path.exists(db_path):
-            print(f"Warning: Database file not found: {db_path}")
-            continue
+    date_filter = ""
+    params = (direction,)
+    if cutoff_date:
+        date_filter = " AND RequestedAt >= ?"
+        params = (direction, cutoff_date)
 
-        try:
-            conn = sqlite3.connect(db_path)
+    try:
+        with stats_connection(db_path, conn_cache) as (conn, db_format):
             cursor = conn.cursor()
-            
-            # Detect database format
-            db_format = check_database_format(db_path)
-            
-            if db_format == 'new':
-                # New format with StateDescription column
-                completed_condition = "StateDescription LIKE 'Completed%'"
-                error_condition = "StateDescription='Completed, Errored'"
-                success_condition = "StateDescription='Completed, Succeeded'"
-            else:
-                # Old format with text State column
-                completed_condition = "State LIKE 'Completed%'"
-                error_condition = "State='Completed, Errored'"
-                success_condition = "State LIKE 'Completed, Succeeded'"
+        
+            conditions = STATE_CONDITIONS[db_format]
+            completed_condition = conditions['completed']
+            error_condition = conditions['error']
+            success_condition = conditions['success']
+
+            # Run all three queries in one read transaction, for a single lock and a consistent snapshot
+            conn.execute("BEGIN DEFERRED")
 
-            # Count total attempts and errors for error rate
+            # Count total attempts and errors for error rate in a single scan
+            check_cancelled(cancelled)
             cursor.execute(f"""
-                SELECT COUNT(*) FROM Transfers
+                SELECT COUNT(*), COALESCE(SUM(CASE WHEN {error_condition} THEN 1 ELSE 0 END), 0)
+                FROM Transfers
                 WHERE Direction=? AND {completed_condition}
                 {date_filter}
-            """, (direction,))
-            stats["total_attempts"] += cursor.fetchone()[0]
+            """, params)
+            total_attempts, error_count = cursor.fetchone()
+            stats["total_attempts"] += total_attempts
+            stats["errors"] += error_count
 
+            # User stats and totals for successful transfers, aggregated by SQLite.
+            # julianday() accepts both the 'Z' suffixed and plain timestamps.
+            check_cancelled(cancelled)
             cursor.execute(f"""
-                SELECT COUNT(*) FROM Transfers
-                WHERE Direction=? AND {error_condition}
-                {date_filter}
-            """, (direction,))
-            stats["errors"] += cursor.fetchone()[0]
+                SELECT Username, COUNT(*), SUM(BytesTransferred),
+                       COALESCE(SUM(CASE WHEN AverageSpeed > 0 THEN AverageSpeed END), 0),
+                       COUNT(CASE WHEN AverageSpeed > 0 THEN 1 END),
+                       COALESCE(SUM(CASE WHEN Duration > 0 THEN Duration END), 0),
+                       COUNT(CASE WHEN Duration > 0 THEN 1 END)
+                FROM (
+                    SELECT Username, BytesTransferred, AverageSpeed,
+                           (julianday(EndedAt) - julianday(StartedAt)) * 86400.0 AS Duration
+                    FROM Transfers
+                    WHERE Direction=? AND {success_condition}
+                    {date_filter}
+                )
+                GROUP BY Username
+            """, params)
+            for (username, count, bytes_transferred, speed_sum, speed_count,
+                 duration_sum, duration_count) in cursor:
+                stats["user_counts"][username] += count
+                stats["user_bytes"][username] += bytes_transferred
+                stats["total_transfers"] += count
+                stats["total_bytes"] += bytes_transferred
+                stats["speed_sum"] += speed_sum
+                stats["speed_count"] += speed_count
+                stats["duration_sum"] += duration_sum
+                stats["duration_count"] += duration_count
 
-            # Get successful transfers
+            # Extension stats, grouped by SQLite using the file_extension() helper open_ro registers
+            check_cancelled(cancelled)
             cursor.execute(f"""
-                SELECT Username, Filename, Size, BytesTransferred, AverageSpeed,
-                       RequestedAt, StartedAt, EndedAt
+                SELECT file_extension(Filename) AS Extension, COUNT(*), SUM(BytesTransferred)
                 FROM Transfers
                 WHERE Direction=? AND {success_condition}
                 {date_filter}
-            """, (direction,))
+                GROUP BY Extension
+            """, params)
+            for ext, count, bytes_transferred in cursor:
+                stats["extension_counts"][ext] += count
+                stats["extension_bytes"][ext] += bytes_transferred
 
-            transfers = cursor.fetchall()
-            conn.close()
+    except sqlite3.Error as e:
+        print(f"Error processing database {db_path}: {e}")
+        if errors is not None:
+            errors.append(f"{db_path}: {e}")
 
-            # Process transfer data
-            for row in transfers:
-                username, filename, size, bytes_transferred, avg_speed, req_at, start_at, end_at = row
+    return stats
 
-                stats["total_transfers"] += 1
-                stats["total_bytes"] += bytes_transferred
-                stats["unique_users"].add(username)
-
-                # User stats
-                stats["user_stats"][username]["count"] += 1
-                stats["user_stats"][username]["bytes"] += bytes_transferred
-
-                # Extension stats
-                ext = os.path.splitext(filename)[1].lower() if filename else ".unknown"
-                if not ext:
-                    ext = ".noext"
-
-                stats["extension_stats"][ext]["count"] += 1
-                stats["extension_stats"][ext]["bytes"] += bytes_transferred
-
-                # Speed stats
-                if avg_speed > 0:
-                    stats["speeds"].append(avg_speed)
-
-                # Duration stats
-                if start_at and end_at:
-                    try:
-                        start_time = datetime.datetime.fromisoformat(start_at.replace('Z', '+00:00'))
-                        end_time = datetime.datetime.fromisoformat(end_at.replace('Z', '+00:00'))
-                        duration = (end_time - start_time).total_seconds()
-                        if duration > 0:
-                            stats["durations"].append(duration)
-                    except (ValueError, TypeError):
-                        pass
+def get_transfer_stats(db_paths, direction="Upload", cutoff_date=None, conn_cache=None,
+                       progress_callback=None, errors=None, cancelled=None):
+    """Get statistics on transfers from the database(s) requested on or after cutoff_date"""
+    stats = empty_transfer_stats()
 
-        except sqlite3.Error as e:
-            print(f"Error processing database {db_path}: {e}")
+    # Scanned one after another: the file_extension() UDF takes the GIL on every row, so
+    # threads per database gave no speedup (16.2s against 14.5s). StatsWorker still runs the
+    # jobs side by side, their GROUP BY queries release the GIL outside of the UDF calls.
+    for db_path in db_paths:
+        check_cancelled(cancelled)
+        if not os.path.exists(db_path):
+            print(f"Warning: Database file not found: {db_path}")
+        else:
+            partial = get_database_transfer_stats(db_path, direction, cutoff_date, conn_cache, errors,
+                                                  cancelled)
+            for key in ("total_transfers", "total_bytes", "speed_sum", "speed_count",
+                        "duration_sum", "duration_count", "total_attempts", "errors"):
+                stats[key] += partial[key]
+            for key in ("user_counts", "user_bytes", "extension_counts", "extension_bytes"):
+                stats[key].update(partial[key])
+        if progress_callback:
+            progress_callback()
 
     # Calculate averages
-    if stats["speeds"]:
-        stats["avg_speed"] = sum(stats["speeds"]) / len(stats["speeds"])
+    if stats["speed_count"]:
+        stats["avg_speed"] = stats["speed_sum"] / stats["speed_count"]
     else:
         stats["avg_speed"] = 0
 
-    if stats["durations"]:
-        stats["avg_duration"] = sum(stats["durations"]) / len(stats["durations"])
+    if stats["duration_count"]:
+        stats["avg_duration"] = stats["duration_sum"] / stats["duration_count"]
     else:
         stats["avg_duration"] = 0
 
@@ -193,11 +347,95 @@ def get_transfer_stats(db_paths, direction="Upload", days=None):
     else:
         stats["error_rate"] = 0
 
-    stats["unique_users"] = len(stats["unique_users"])
+    # Every successful user has an entry in user_counts, across all databases
+    stats["unique_users"] = len(stats["user_counts"])
 
     return stats
 
-def get_time_series_data(db_paths, days=None):
+def empty_daily_stats():
+    """Create the per-day accumulator that time series data is summed into"""
+    return {
+        'upload_count': 0, 'download_count': 0,
+        'upload_bytes': 0, 'download_bytes': 0,
+        'upload_errors': 0, 'download_errors': 0,
+        'upload_attempts': 0, 'download_attempts': 0,
+        'upload_speed_sum': 0.0, 'download_speed_sum': 0.0,
+        'upload_speed_count': 0, 'download_speed_count': 0,
+        'users': set()
+    }
+
+def get_database_time_series(db_path, cutoff_date=None, conn_cache=None, errors=None, cancelled=None):
+    """Get partial per-day time series data from a single database file, failures are added to errors"""
+    daily_data = defaultdict(empty_daily_stats)
+
+    date_filter = ""
+    params = ()
+    if cutoff_date:
+        date_filter = " AND RequestedAt >= ?"
+        params = (cutoff_date,)
+    
+    try:
+        with stats_connection(db_path, conn_cache) as (conn, db_format):
+            cursor = conn.cursor()
+        
+            conditions = STATE_CONDITIONS[db_format]
+            success_condition = conditions['success']
+            error_condition = conditions['error']
+            completed_condition = conditions['completed']
+        
+            # Per-day counts, bytes, speeds, errors and attempts for both directions in one
+            # aggregated scan. Success and error states are both subsets of completed ones.
+            # Neither time series query filters on Direction, so both scan the table rather
+            # than seek the index. Seeking it through Direction IN (...) was no faster unless
+            # the cutoff was short, and a second index would slow down slskd's writes.
+            check_cancelled(cancelled)
+            cursor.execute(f"""
+                SELECT DATE(RequestedAt) as date, Direction,
+                       SUM(CASE WHEN {success_condition} THEN 1 ELSE 0 END),
+                       COALESCE(SUM(CASE WHEN {success_condition} THEN BytesTransferred END), 0),
+                       COALESCE(SUM(CASE WHEN {success_condition} AND AverageSpeed > 0 THEN AverageSpeed END), 0),
+                       COUNT(CASE WHEN {success_condition} AND AverageSpeed > 0 THEN 1 END),
+                       SUM(CASE WHEN {error_condition} THEN 1 ELSE 0 END),
+                       COUNT(*)
+                FROM Transfers
+                WHERE {completed_condition}
+                {date_filter}
+                GROUP BY date, Direction
+            """, params)
+        
+            for (date, direction, count, bytes_transferred, speed_sum, speed_count,
+                 error_count, total_count) in cursor:
+                prefix = 'upload' if direction == 'Upload' else 'download'
+                data = daily_data[date]
+                data[f'{prefix}_count'] += count
+                data[f'{prefix}_bytes'] += bytes_transferred
+                data[f'{prefix}_speed_sum'] += speed_sum
+                data[f'{prefix}_speed_count'] += speed_count
+                data[f'{prefix}_errors'] += error_count
+                data[f'{prefix}_attempts'] += total_count
+        
+            # Distinct users per day. Kept as sets rather than COUNT(DISTINCT) so a user
+            # present in several databases is still counted once after merging.
+            check_cancelled(cancelled)
+            cursor.execute(f"""
+                SELECT DISTINCT DATE(RequestedAt) as date, Username
+                FROM Transfers
+                WHERE {success_condition}
+                {date_filter}
+            """, params)
+        
+            for date, username in cursor:
+                daily_data[date]['users'].add(username)
+        
+    except sqlite3.Error as e:
+        print(f"Error processing database {db_path}: {e}")
+        if errors is not None:
+            errors.append(f"{db_path}: {e}")
+
+    return daily_data
+
+def get_time_series_data(db_paths, cutoff_date=None, conn_cache=None, progress_callback=None,
+                         errors=None, cancelled=None):
     """Get time series data for graphing"""
     time_series = {
         'dates': [],
@@ -214,111 +452,30 @@ def get_time_series_data(db_paths, days=None):
         'download_error_rates': []
     }
     
-    date_filter = ""
-    if days:
-        cutoff_date = (datetime.datetime.now() - datetime.timedelta(days=days)).strftime("%Y-%m-%d")
-        date_filter = f" AND RequestedAt >= '{cutoff_date}'"
-    
-    # Collect all data points by date
-    daily_data = defaultdict(lambda: {
-        'upload_count': 0, 'download_count': 0,
-        'upload_bytes': 0, 'download_bytes': 0,
-        'upload_errors': 0, 'download_errors': 0,
-        'upload_attempts': 0, 'download_attempts': 0,
-        'upload_speeds': [], 'download_speeds': [],
-        'users': set()
-    })
-    
+    # Collect all data points by date. Databases are scanned one after another, since the
+    # row loops below hold the GIL and per-database threads only contended for it.
+    daily_data = defaultdict(empty_daily_stats)
     for db_path in db_paths:
-        if not os.path.exists(db_path):
-            continue
-            
-        try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            
-            # Detect database format
-            db_format = check_database_format(db_path)
-            
-            if db_format == 'new':
-                success_condition = "StateDescription='Completed, Succeeded'"
-                error_condition = "StateDescription='Completed, Errored'"
-                completed_condition = "StateDescription LIKE 'Completed%'"
-            else:
-                success_condition = "State LIKE 'Completed, Succeeded'"
-                error_condition = "State='Completed, Errored'"
-                completed_condition = "State LIKE 'Completed%'"
-            
-            # Get successful transfers
-            cursor.execute(f"""
-                SELECT Direction, Username, BytesTransferred, AverageSpeed, 
-                       DATE(RequestedAt) as date
-                FROM Transfers
-                WHERE {success_condition}
-                {date_filter}
-                ORDER BY date
-            """)
-            
-            for row in cursor.fetchall():
-                direction, username, bytes_transferred, avg_speed, date = row
-                daily_data[date]['users'].add(username)
-                
-                if direction == 'Upload':
-                    daily_data[date]['upload_count'] += 1
-                    daily_data[date]['upload_bytes'] += bytes_transferred
-                    if avg_speed > 0:
-                        daily_data[date]['upload_speeds'].append(avg_speed)
-                else:
-                    daily_data[date]['download_count'] += 1
-                    daily_data[date]['download_bytes'] += bytes_transferred
-                    if avg_speed > 0:
-                        daily_data[date]['download_speeds'].append(avg_speed)
-            
-            # Get error counts
-            cursor.execute(f"""
-                SELECT Direction, COUNT(*) as error_count, DATE(RequestedAt) as date
-                FROM Transfers
-                WHERE {error_condition}
-                {date_filter}
-                GROUP BY Direction, DATE(RequestedAt)
-            """)
-            
-            for row in cursor.fetchall():
-                direction, error_count, date = row
-                if direction == 'Upload':
-                    daily_data[date]['upload_errors'] += error_count
-                else:
-                    daily_data[date]['download_errors'] += error_count
-            
-            # Get total attempts for error rate calculation
-            cursor.execute(f"""
-                SELECT Direction, COUNT(*) as total_count, DATE(RequestedAt) as date
-                FROM Transfers
-                WHERE {completed_condition}
-                {date_filter}
-                GROUP BY Direction, DATE(RequestedAt)
-            """)
-            
-            for row in cursor.fetchall():
-                direction, total_count, date = row
-                if direction == 'Upload':
-                    daily_data[date]['upload_attempts'] += total_count
-                else:
-                    daily_data[date]['download_attempts'] += total_count
-            
-            conn.close()
-            
-        except sqlite3.Error as e:
-            print(f"Error processing database {db_path}: {e}")
+        check_cancelled(cancelled)
+        if os.path.exists(db_path):
+            partial = get_database_time_series(db_path, cutoff_date, conn_cache, errors, cancelled)
+            for date, data in partial.items():
+                merged = daily_data[date]
+                for key in ('upload_count', 'download_count', 'upload_bytes', 'download_bytes',
+                            'upload_errors', 'download_errors', 'upload_attempts', 'download_attempts',
+                            'upload_speed_sum', 'download_speed_sum',
+                            'upload_speed_count', 'download_speed_count'):
+                    merged[key] += data[key]
+                merged['users'] |= data['users']
+        if progress_callback:
+            progress_callback()
     
     # Convert to time series format
     sorted_dates = sorted(daily_data.keys())
     
     for date_str in sorted_dates:
-        date_obj = datetime.datetime.strptime(date_str, '%Y-%m-%d').date()
         data = daily_data[date_str]
         
-        time_series['dates'].append(date_obj)
         time_series['upload_counts'].append(data['upload_count'])
         time_series['download_counts'].append(data['download_count'])
         time_series['upload_bytes'].append(data['upload_bytes'])
@@ -328,8 +485,8 @@ def get_time_series_data(db_paths, days=None):
         time_series['new_users'].append(len(data['users']))
         
         # Calculate average speeds
-        upload_avg_speed = sum(data['upload_speeds']) / len(data['upload_speeds']) if data['upload_speeds'] else 0
-        download_avg_speed = sum(data['download_speeds']) / len(data['download_speeds']) if data['download_speeds'] else 0
+        upload_avg_speed = data['upload_speed_sum'] / data['upload_speed_count'] if data['upload_speed_count'] else 0
+        download_avg_speed = data['download_speed_sum'] / data['download_speed_count'] if data['download_speed_count'] else 0
         time_series['upload_speeds'].append(upload_avg_speed)
         time_series['download_speeds'].append(download_avg_speed)
         
@@ -339,9 +496,143 @@ def get_time_series_data(db_paths, days=None):
         time_series['upload_error_rates'].append(upload_error_rate)
         time_series['download_error_rates'].append(download_error_rate)
     
+    # Numeric series become arrays so the graphs can convert them element-wise
+    for key, values in time_series.items():
+        time_series[key] = np.asarray(values)
+    # SQLite's DATE() always yields YYYY-MM-DD, which numpy parses in one call. Matplotlib
+    # converts datetime64 arrays vectorized instead of one date object at a time.
+    time_series['dates'] = np.array(sorted_dates, dtype='datetime64[D]')
+    # Summed once here instead of on every graph redraw
+    time_series['total_errors'] = time_series['upload_errors'] + time_series['download_errors']
+    
     return time_series
 
 
+class WorkerSignals(QObject):
+    """Signals emitted by StatsWorker, delivered to slots on the GUI thread"""
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(tuple, dict, dict, dict, dict)
+    error = pyqtSignal(str)
+
+class StatsWorker(QRunnable):
+    """Query upload, download, time series and popularity stats on a thread pool thread"""
+    def __init__(self, db_paths, cutoff_date, days, conn_caches):
+        super().__init__()
+        self.db_paths = list(db_paths)
+        self.cutoff_date = cutoff_date
+        self.days = days
+        self.conn_caches = conn_caches
+        self.signals = WorkerSignals()
+        # Databases that failed to read, the results are then not worth caching
+        self.errors = []
+        # Set by stopAnalysis, the jobs check it before each database and query
+        self.cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._done = 0
+
+    def reportProgress(self):
+        # Called once per database by each of the three stats jobs and once by the popularity job
+        with self._lock:
+            self._done += 1
+            done = self._done
+        self.signals.progress.emit(done, 3 * len(self.db_paths) + 1)
+
+    def collectPopularity(self):
+        # Both run on this thread, so they share one connection pool
+        conn_cache = self.conn_caches["Popularity"]
+        format_info = analyze_library_format(self.db_paths, conn_cache, self.errors, self.cancelled)
+        artist_counts, artist_bytes, album_counts, album_bytes = get_popularity_stats(
+            self.db_paths, self.days, conn_cache, self.errors, self.cancelled)
+        self.reportProgress()
+        return {
+            'format_info': format_info,
+            'artist_counts': artist_counts,
+            'artist_bytes': artist_bytes,
+            'album_counts': album_counts,
+            'album_bytes': album_bytes,
+        }
+
+    def run(self):
+        try:
+            # Build the index once per database before the jobs start reading
+            for db_path in self.db_paths:
+                check_cancelled(self.cancelled)
+                if os.path.exists(db_path):
+                    ensure_transfer_indexes(db_path)
+            # Taken after the index step, so the results are cached under the state they were read from
+            stats_key = (database_signature(self.db_paths), self.cutoff_date)
+            # Each job has its own connection pool, so they can run side by side. The upload and
+            # download jobs share the GIL for their file_extension() calls, which are only part
+            # of their extension query.
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                upload = executor.submit(get_transfer_stats, self.db_paths, "Upload", self.cutoff_date,
+                                         self.conn_caches["Upload"], self.reportProgress, self.errors,
+                                         self.cancelled)
+                download = executor.submit(get_transfer_stats, self.db_paths, "Download", self.cutoff_date,
+                                           self.conn_caches["Download"], self.reportProgress, self.errors,
+                                           self.cancelled)
+                time_series = executor.submit(get_time_series_data, self.db_paths, self.cutoff_date,
+                                              self.conn_caches["TimeSeries"], self.reportProgress, self.errors,
+                                              self.cancelled)
+                popularity = executor.submit(self.collectPopularity)
+            # A query interrupted on the last database ends its job normally, so check once more
+            check_cancelled(self.cancelled)
+            self.signals.finished.emit(stats_key, upload.result(), download.result(), time_series.result(),
+                                       popularity.result())
+        except AnalysisCancelled:
+            pass  # Stopped by stopAnalysis, which has already reset the window
+        except Exception as e:
+            self.signals.error.emit(str(e))
+
+
+class StatsTableModel(QAbstractTableModel):
+    """Table model holding raw row tuples, formatted for display on demand"""
+    def __init__(self, headers, formatters, parent=None):
+        super().__init__(parent)
+        self.headers = headers
+        self.formatters = formatters
+        self.rows = []
+
+    def setRows(self, rows):
+        self.beginResetModel()
+        self.rows = list(rows)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self.rows[index.row()][index.column()]
+        if role == Qt.DisplayRole:
+            return self.formatters[index.column()](value)
+        if role == Qt.UserRole:
+            # Raw value, so sorting compares numbers rather than formatted sizes
+            return value
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+
+class StatsSortProxyModel(QSortFilterProxyModel):
+    """Sort a StatsTableModel on its raw values"""
+    def __init__(self, source_model, parent=None):
+        super().__init__(parent)
+        self.setSourceModel(source_model)
+        self.setSortRole(Qt.UserRole)
+
+    def lessThan(self, left, right):
+        # Compare in Python, QVariant comparison truncates sizes above 2 GiB
+        return left.data(self.sortRole()) < right.data(self.sortRole())
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -351,6 +642,22 @@ class MainWindow(QMainWindow):
         self.resize(1000, 750)
         
         self.db_paths = []
+        # Open connections and detected formats, reused across analyses.
+        # Each query job runs on its own thread so it gets its own connections.
+        self._conn_caches = {"Upload": {}, "Download": {}, "TimeSeries": {}, "Popularity": {}}
+        self._statsWorker = None
+        # Finished analyses keyed by database signature and cutoff, so an unchanged
+        # re-analysis is served without querying again
+        self._stats_cache = {}
+        # Popularity results of the last analysis, re-rendered when the top entries change
+        self.popularityData = None
+        
+        # Coalesce bursts of graph updates into a single redraw
+        self.graphTimer = QTimer(self)
+        self.graphTimer.setSingleShot(True)
+        self.graphTimer.setInterval(50)
+        self.graphTimer.timeout.connect(self.redrawGraphs)
+        self.amountLines = []
         
         # Create central widget and main layout
         self.centralWidget = QWidget()
@@ -376,12 +683,12 @@ class MainWindow(QMainWindow):
         
         # Database buttons only (no label)
         dbButtonsLayout = QHBoxLayout()
-        addDbButton = QPushButton("Add Database File")
-        addDbButton.clicked.connect(self.addDatabaseFile)
-        clearDbButton = QPushButton("Clear Database Files")
-        clearDbButton.clicked.connect(self.clearDatabaseFiles)
-        dbButtonsLayout.addWidget(addDbButton)
-        dbButtonsLayout.addWidget(clearDbButton)
+        self.addDbButton = QPushButton("Add Database File")
+        self.addDbButton.clicked.connect(self.addDatabaseFile)
+        self.clearDbButton = QPushButton("Clear Database Files")
+        self.clearDbButton.clicked.connect(self.clearDatabaseFiles)
+        dbButtonsLayout.addWidget(self.addDbButton)
+        dbButtonsLayout.addWidget(self.clearDbButton)
         
         # Analysis controls - right side
         analyzeControlsLayout = QHBoxLayout()
@@ -396,6 +703,12 @@ class MainWindow(QMainWindow):
         self.analyzeButton.clicked.connect(self.analyzeTransfers)
         analyzeControlsLayout.addWidget(self.analyzeButton)
         
+        # Progress of a running analysis, one step per database and query job
+        self.progressBar = QProgressBar()
+        self.progressBar.setMaximumWidth(150)
+        self.progressBar.setVisible(False)
+        analyzeControlsLayout.addWidget(self.progressBar)
+        
         # Create a frame for the vertical separator
         separator = QLabel("|")
         separator.setAlignment(Qt.AlignCenter)
@@ -473,12 +786,12 @@ class MainWindow(QMainWindow):
         # Upload users
         uploadUsersGroup = QGroupBox("Top Users by Upload Size")
         uploadUsersLayout = QVBoxLayout()
-        self.uploadUsersTable = QTableWidget(0, 3)
-        self.uploadUsersTable.setHorizontalHeaderLabels(["User", "Files", "Data"])
+        self.uploadUsersTable = QTableView()
+        self.uploadUsersTable.setModel(StatsTableModel(["User", "Files", "Data"], (str, str, format_size), self))
         self.uploadUsersTable.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.uploadUsersTable.setMinimumHeight(100)
         self.uploadUsersTable.setAlternatingRowColors(True)
-        self.uploadUsersTable.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.uploadUsersTable.setEditTriggers(QTableView.NoEditTriggers)
         uploadUsersLayout.addWidget(self.uploadUsersTable)
         uploadUsersGroup.setLayout(uploadUsersLayout)
         usersSection.addWidget(uploadUsersGroup)
@@ -486,12 +799,12 @@ class MainWindow(QMainWindow):
         # Download users
         downloadUsersGroup = QGroupBox("Top Users by Download Size")
         downloadUsersLayout = QVBoxLayout()
-        self.downloadUsersTable = QTableWidget(0, 3)
-        self.downloadUsersTable.setHorizontalHeaderLabels(["User", "Files", "Data"])
+        self.downloadUsersTable = QTableView()
+        self.downloadUsersTable.setModel(StatsTableModel(["User", "Files", "Data"], (str, str, format_size), self))
         self.downloadUsersTable.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.downloadUsersTable.setMinimumHeight(100)
         self.downloadUsersTable.setAlternatingRowColors(True)
-        self.downloadUsersTable.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.downloadUsersTable.setEditTriggers(QTableView.NoEditTriggers)
         downloadUsersLayout.addWidget(self.downloadUsersTable)
         downloadUsersGroup.setLayout(downloadUsersLayout)
         usersSection.addWidget(downloadUsersGroup)
@@ -504,12 +817,12 @@ class MainWindow(QMainWindow):
         # Upload file types
         uploadTypesGroup = QGroupBox("Top File Types (Uploads)")
         uploadTypesLayout = QVBoxLayout()
-        self.uploadTypesTable = QTableWidget(0, 3)
-        self.uploadTypesTable.setHorizontalHeaderLabels(["Extension", "Files", "Data"])
+        self.uploadTypesTable = QTableView()
+        self.uploadTypesTable.setModel(StatsTableModel(["Extension", "Files", "Data"], (str, str, format_size), self))
         self.uploadTypesTable.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.uploadTypesTable.setMinimumHeight(100)
         self.uploadTypesTable.setAlternatingRowColors(True)
-        self.uploadTypesTable.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.uploadTypesTable.setEditTriggers(QTableView.NoEditTriggers)
         uploadTypesLayout.addWidget(self.uploadTypesTable)
         uploadTypesGroup.setLayout(uploadTypesLayout)
         typesSection.addWidget(uploadTypesGroup)
@@ -517,12 +830,12 @@ class MainWindow(QMainWindow):
         # Download file types
         downloadTypesGroup = QGroupBox("Top File Types (Downloads)")
         downloadTypesLayout = QVBoxLayout()
-        self.downloadTypesTable = QTableWidget(0, 3)
-        self.downloadTypesTable.setHorizontalHeaderLabels(["Extension", "Files", "Data"])
+        self.downloadTypesTable = QTableView()
+        self.downloadTypesTable.setModel(StatsTableModel(["Extension", "Files", "Data"], (str, str, format_size), self))
         self.downloadTypesTable.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.downloadTypesTable.setMinimumHeight(100)
         self.downloadTypesTable.setAlternatingRowColors(True)
-        self.downloadTypesTable.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.downloadTypesTable.setEditTriggers(QTableView.NoEditTriggers)
         downloadTypesLayout.addWidget(self.downloadTypesTable)
         downloadTypesGroup.setLayout(downloadTypesLayout)
         typesSection.addWidget(downloadTypesGroup)
@@ -545,19 +858,19 @@ class MainWindow(QMainWindow):
         amountsCheckboxLayout = QHBoxLayout()
         self.uploadsCheckbox = QCheckBox("Uploads")
         self.uploadsCheckbox.setChecked(True)
-        self.uploadsCheckbox.stateChanged.connect(self.updateGraphs)
+        self.uploadsCheckbox.stateChanged.connect(self.toggleAmountLines)
         
         self.downloadsCheckbox = QCheckBox("Downloads")
         self.downloadsCheckbox.setChecked(True)
-        self.downloadsCheckbox.stateChanged.connect(self.updateGraphs)
+        self.downloadsCheckbox.stateChanged.connect(self.toggleAmountLines)
         
         self.errorsCheckbox = QCheckBox("Errors")
         self.errorsCheckbox.setChecked(True)
-        self.errorsCheckbox.stateChanged.connect(self.updateGraphs)
+        self.errorsCheckbox.stateChanged.connect(self.toggleAmountLines)
         
         self.newUsersCheckbox = QCheckBox("New Users")
         self.newUsersCheckbox.setChecked(False)
-        self.newUsersCheckbox.stateChanged.connect(self.updateGraphs)
+        self.newUsersCheckbox.stateChanged.connect(self.toggleAmountLines)
         
         amountsCheckboxLayout.addWidget(self.uploadsCheckbox)
         amountsCheckboxLayout.addWidget(self.downloadsCheckbox)
@@ -610,6 +923,16 @@ class MainWindow(QMainWindow):
         # Add the visual tab
         self.tabs.addTab(self.visualWidget, "Visual Stats")
         
+        # Axes are created once and cleared with cla() on each redraw
+        self.amountsAxes = self.amountsFigure.add_subplot(111)
+        self.ratiosAxes = self.ratiosFigure.add_subplot(111)
+        self.ratiosTwinAxes = None
+        # Date tick locators and formatter per axes, a locator can only be attached to one axis
+        self.dateTickers = {
+            ax: (mdates.WeekdayLocator(), mdates.DayLocator(), mdates.DateFormatter('%m/%d'))
+            for ax in (self.amountsAxes, self.ratiosAxes)
+        }
+        
         # Initialize empty graphs
         self.timeSeriesData = None
         self.updateGraphs()
@@ -646,18 +969,23 @@ class MainWindow(QMainWindow):
         artistsGroup = QGroupBox("Top Artists by Downloads")
         artistsLayout = QVBoxLayout()
         
-        self.artistsTable = QTableWidget()
-        self.artistsTable.setColumnCount(3)
-        self.artistsTable.setHorizontalHeaderLabels(["Artist", "Downloads", "Total Data"])
+        self.artistsTable = QTableView()
+        self.artistsTable.setModel(StatsSortProxyModel(
+            StatsTableModel(["Artist", "Downloads", "Total Data"], (str, str, format_size), self), self))
         self.artistsTable.horizontalHeader().setStretchLastSection(True)
         self.artistsTable.setAlternatingRowColors(True)
         self.artistsTable.setSortingEnabled(True)
-        self.artistsTable.setEditTriggers(QTableWidget.NoEditTriggers)
+        # Otherwise the header's default indicator sorts by name, start in download order
+        self.artistsTable.sortByColumn(1, Qt.DescendingOrder)
+        self.artistsTable.setEditTriggers(QTableView.NoEditTriggers)
         artistsLayout.addWidget(self.artistsTable)
         
         # Artists chart
         self.artistsFigure = Figure(figsize=(8, 6))
         self.artistsCanvas = FigureCanvas(self.artistsFigure)
+        # Bars, labels and counts of the current chart, read by the hover handler
+        self.artistsHover = ([], [], [])
+        self.artistsCanvas.mpl_connect('motion_notify_event', self.onArtistHover)
         artistsLayout.addWidget(self.artistsCanvas, 0, Qt.AlignCenter)
         
         artistsGroup.setLayout(artistsLayout)
@@ -667,18 +995,21 @@ class MainWindow(QMainWindow):
         albumsGroup = QGroupBox("Top Albums by Downloads")
         albumsLayout = QVBoxLayout()
         
-        self.albumsTable = QTableWidget()
-        self.albumsTable.setColumnCount(4)
-        self.albumsTable.setHorizontalHeaderLabels(["Artist", "Album", "Downloads", "Total Data"])
+        self.albumsTable = QTableView()
+        self.albumsTable.setModel(StatsSortProxyModel(
+            StatsTableModel(["Artist", "Album", "Downloads", "Total Data"], (str, str, str, format_size), self), self))
         self.albumsTable.horizontalHeader().setStretchLastSection(True)
         self.albumsTable.setAlternatingRowColors(True)
         self.albumsTable.setSortingEnabled(True)
-        self.albumsTable.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.albumsTable.sortByColumn(2, Qt.DescendingOrder)
+        self.albumsTable.setEditTriggers(QTableView.NoEditTriggers)
         albumsLayout.addWidget(self.albumsTable)
         
         # Albums chart
         self.albumsFigure = Figure(figsize=(8, 6))
         self.albumsCanvas = FigureCanvas(self.albumsFigure)
+        self.albumsHover = ([], [], [])
+        self.albumsCanvas.mpl_connect('motion_notify_event', self.onAlbumHover)
         albumsLayout.addWidget(self.albumsCanvas, 0, Qt.AlignCenter)
         
         albumsGroup.setLayout(albumsLayout)
@@ -701,12 +1032,24 @@ class MainWindow(QMainWindow):
                 if file not in self.db_paths:
                     self.db_paths.append(file)
             
+            self._stats_cache.clear()
             self.updateDbPathsLabel()
     
     def clearDatabaseFiles(self):
+        # The worker may still be querying through the pooled connections
+        self.stopAnalysis()
         self.db_paths = []
+        self._stats_cache.clear()
+        for conn_cache in self._conn_caches.values():
+            close_connections(conn_cache)
         self.dbPathsLabel.setText("No database files selected")
     
+    def closeEvent(self, event):
+        self.stopAnalysis()
+        for conn_cache in self._conn_caches.values():
+            close_connections(conn_cache)
+        super().closeEvent(event)
+    
     def updateDbPathsLabel(self):
         if not self.db_paths:
             self.dbPathsLabel.setText("No database files selected")
@@ -714,49 +1057,44 @@ class MainWindow(QMainWindow):
             paths_text = ", ".join(os.path.basename(path) for path in self.db_paths)
             self.dbPathsLabel.setText(f"Database(s): {paths_text}")
     
-    def populateTable(self, table, data, top_n):
-        table.setRowCount(0)
-        for i, (name, stats) in enumerate(data[:top_n]):
-            table.insertRow(i)
-            table.setItem(i, 0, QTableWidgetItem(name))
-            table.setItem(i, 1, QTableWidgetItem(str(stats["count"])))
-            table.setItem(i, 2, QTableWidgetItem(format_size(stats["bytes"])))
+    def setTableRows(self, table, rows):
+        model = table.model()
+        if isinstance(model, QSortFilterProxyModel):
+            model = model.sourceModel()
+        model.setRows(rows)
     
     def updateGraphs(self):
+        """Schedule a graph redraw, restarting the timer so a burst of changes draws once"""
+        self.graphTimer.start()
+    
+    def redrawGraphs(self):
         """Update the graphs based on current data and checkbox states"""
-        if not self.timeSeriesData or not self.timeSeriesData['dates']:
+        if not self.timeSeriesData or not len(self.timeSeriesData['dates']):
             # Clear graphs if no data
-            self.amountsFigure.clear()
-            self.ratiosFigure.clear()
-            self.amountsCanvas.draw()
-            self.ratiosCanvas.draw()
+            self.amountLines = []
+            self.removeRatiosTwinAxes()
+            for ax in (self.amountsAxes, self.ratiosAxes):
+                ax.cla()
+                ax.set_visible(False)
+            self.amountsCanvas.draw_idle()
+            self.ratiosCanvas.draw_idle()
             return
         
         # Update amounts graph
-        self.amountsFigure.clear()
-        ax1 = self.amountsFigure.add_subplot(111)
+        ax1 = self.amountsAxes
+        ax1.cla()
+        ax1.set_visible(True)
         
         dates = self.timeSeriesData['dates']
         
-        # Plot lines and collect them for cursor tooltips
-        lines = []
-        if self.uploadsCheckbox.isChecked():
-            plot_result = ax1.plot(dates, self.timeSeriesData['upload_counts'], label='Uploads', color='blue', linewidth=2)
-            if plot_result:
-                lines.append((plot_result[0], 'upload_counts', 'Uploads'))
-        if self.downloadsCheckbox.isChecked():
-            plot_result = ax1.plot(dates, self.timeSeriesData['download_counts'], label='Downloads', color='green', linewidth=2)
-            if plot_result:
-                lines.append((plot_result[0], 'download_counts', 'Downloads'))
-        if self.errorsCheckbox.isChecked():
-            total_errors = [u + d for u, d in zip(self.timeSeriesData['upload_errors'], self.timeSeriesData['download_errors'])]
-            plot_result = ax1.plot(dates, total_errors, label='Total Errors', color='red', linewidth=2)
-            if plot_result:
-                lines.append((plot_result[0], 'total_errors', 'Total Errors'))
-        if self.newUsersCheckbox.isChecked():
-            plot_result = ax1.plot(dates, self.timeSeriesData['new_users'], label='New Users', color='purple', linewidth=2)
-            if plot_result:
-                lines.append((plot_result[0], 'new_users', 'New Users'))
+        # Plot every line once and keep them by checkbox, toggling a checkbox
+        # then only flips visibility instead of rebuilding the figure
+        self.amountLines = [
+            (self.uploadsCheckbox, ax1.plot(*decimate_series(dates, self.timeSeriesData['upload_counts']), label='Uploads', color='blue', linewidth=2)[0]),
+            (self.downloadsCheckbox, ax1.plot(*decimate_series(dates, self.timeSeriesData['download_counts']), label='Downloads', color='green', linewidth=2)[0]),
+            (self.errorsCheckbox, ax1.plot(*decimate_series(dates, self.timeSeriesData['total_errors']), label='Total Errors', color='red', linewidth=2)[0]),
+            (self.newUsersCheckbox, ax1.plot(*decimate_series(dates, self.timeSeriesData['new_users']), label='New Users', color='purple', linewidth=2)[0]),
+        ]
         
         # Interactive functionality disabled to avoid compatibility issues
         # Charts remain readable with legends and axis labels
@@ -764,98 +1102,66 @@ class MainWindow(QMainWindow):
         ax1.set_xlabel('Date')
         ax1.set_ylabel('Count')
         ax1.set_title('Transfer Amounts Over Time')
-        ax1.legend()
+        self.applyAmountLineVisibility(ax1)
         ax1.grid(True, alpha=0.3)
         
-        # Format x-axis dates
-        if len(dates) > 30:
-            ax1.xaxis.set_major_locator(mdates.WeekdayLocator())
-            ax1.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d'))
-        else:
-            ax1.xaxis.set_major_locator(mdates.DayLocator())
-            ax1.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d'))
+        self.formatDateAxis(ax1, len(dates))
         
         self.amountsFigure.autofmt_xdate()
         self.amountsFigure.tight_layout()
         
         # Update ratios graph with dynamic y-axes
-        self.ratiosFigure.clear()
+        self.removeRatiosTwinAxes()
+        self.ratiosAxes.cla()
         
         # Check which metrics are enabled
         show_speeds = self.speedsCheckbox.isChecked()
         show_error_rates = self.errorRateCheckbox.isChecked()
+        self.ratiosAxes.set_visible(show_speeds or show_error_rates)
         
-        # Plot ratios and collect lines for cursor tooltips
-        ratio_lines = []
+        # Plot ratios, cursor tooltips are disabled so the lines are not tracked
         if show_speeds and show_error_rates:
             # Both metrics - use dual y-axis
-            ax2 = self.ratiosFigure.add_subplot(111)
-            ax3 = ax2.twinx()
+            ax2 = self.ratiosAxes
+            ax3 = self.ratiosTwinAxes = ax2.twinx()
             
             # Speed on left axis
-            upload_speeds = [s / (1024*1024) for s in self.timeSeriesData['upload_speeds']]  # Convert to MB/s
-            download_speeds = [s / (1024*1024) for s in self.timeSeriesData['download_speeds']]  # Convert to MB/s
+            upload_speeds = self.timeSeriesData['upload_speeds'] * BYTES_TO_MB  # Convert to MB/s
+            download_speeds = self.timeSeriesData['download_speeds'] * BYTES_TO_MB  # Convert to MB/s
             
-            speed_plot1 = ax2.plot(dates, upload_speeds, label='Upload Speed', color='blue', linewidth=2)
-            speed_plot2 = ax2.plot(dates, download_speeds, label='Download Speed', color='green', linewidth=2)
-            if speed_plot1:
-                ratio_lines.append((speed_plot1[0], 'upload_speeds', 'Upload Speed', 'MB/s'))
-            if speed_plot2:
-                ratio_lines.append((speed_plot2[0], 'download_speeds', 'Download Speed', 'MB/s'))
+            speed_plot1 = ax2.plot(*decimate_series(dates, upload_speeds), label='Upload Speed', color='blue', linewidth=2)
+            speed_plot2 = ax2.plot(*decimate_series(dates, download_speeds), label='Download Speed', color='green', linewidth=2)
             ax2.set_ylabel('Speed (MB/s)', color='black')
             ax2.tick_params(axis='y', labelcolor='black')
             
             # Error rates on right axis
-            error_plot1 = ax3.plot(dates, self.timeSeriesData['upload_error_rates'], label='Upload Error Rate', color='red', linewidth=2, linestyle='--')
-            error_plot2 = ax3.plot(dates, self.timeSeriesData['download_error_rates'], label='Download Error Rate', color='orange', linewidth=2, linestyle='--')
-            if error_plot1:
-                ratio_lines.append((error_plot1[0], 'upload_error_rates', 'Upload Error Rate', '%'))
-            if error_plot2:
-                ratio_lines.append((error_plot2[0], 'download_error_rates', 'Download Error Rate', '%'))
+            error_plot1 = ax3.plot(*decimate_series(dates, self.timeSeriesData['upload_error_rates']), label='Upload Error Rate', color='red', linewidth=2, linestyle='--')
+            error_plot2 = ax3.plot(*decimate_series(dates, self.timeSeriesData['download_error_rates']), label='Download Error Rate', color='orange', linewidth=2, linestyle='--')
             ax3.set_ylabel('Error Rate (%)', color='black')
             ax3.tick_params(axis='y', labelcolor='black')
             
-            # Combine legends
-            legend_lines = []
-            if speed_plot1:
-                legend_lines.append(speed_plot1[0])
-            if speed_plot2:
-                legend_lines.append(speed_plot2[0])
-            if error_plot1:
-                legend_lines.append(error_plot1[0])
-            if error_plot2:
-                legend_lines.append(error_plot2[0])
-            
-            if legend_lines:
-                labels = [l.get_label() for l in legend_lines]
-                ax2.legend(legend_lines, labels, loc='upper left')
+            # Combine legends, the labels are taken from the lines themselves
+            legend_lines = speed_plot1 + speed_plot2 + error_plot1 + error_plot2
+            ax2.legend(handles=legend_lines, loc='upper left')
             
         elif show_speeds:
             # Only speeds - single y-axis
-            ax2 = self.ratiosFigure.add_subplot(111)
+            ax2 = self.ratiosAxes
             
-            upload_speeds = [s / (1024*1024) for s in self.timeSeriesData['upload_speeds']]  # Convert to MB/s
-            download_speeds = [s / (1024*1024) for s in self.timeSeriesData['download_speeds']]  # Convert to MB/s
+            upload_speeds = self.timeSeriesData['upload_speeds'] * BYTES_TO_MB  # Convert to MB/s
+            download_speeds = self.timeSeriesData['download_speeds'] * BYTES_TO_MB  # Convert to MB/s
             
-            plot_result1 = ax2.plot(dates, upload_speeds, label='Upload Speed', color='blue', linewidth=2)
-            plot_result2 = ax2.plot(dates, download_speeds, label='Download Speed', color='green', linewidth=2)
-            if plot_result1:
-                ratio_lines.append((plot_result1[0], 'upload_speeds', 'Upload Speed', 'MB/s'))
-            if plot_result2:
-                ratio_lines.append((plot_result2[0], 'download_speeds', 'Download Speed', 'MB/s'))
+            ax2.plot(*decimate_series(dates, upload_speeds), label='Upload Speed', color='blue', linewidth=2)
+            ax2.plot(*decimate_series(dates, download_speeds), label='Download Speed', color='green', linewidth=2)
             ax2.set_ylabel('Speed (MB/s)')
             ax2.legend()
             
         elif show_error_rates:
             # Only error rates - single y-axis
-            ax2 = self.ratiosFigure.add_subplot(111)
+            ax2 = self.ratiosAxes
             
-            plot_result1 = ax2.plot(dates, self.timeSeriesData['upload_error_rates'], label='Upload Error Rate', color='red', linewidth=2)
-            plot_result2 = ax2.plot(dates, self.timeSeriesData['download_error_rates'], label='Download Error Rate', color='orange', linewidth=2)
-            if plot_result1:
-                ratio_lines.append((plot_result1[0], 'upload_error_rates', 'Upload Error Rate', '%'))
-            if plot_result2:
-                ratio_lines.append((plot_result2[0], 'download_error_rates', 'Download Error Rate', '%'))
+            ax2.plot(*decimate_series(dates, self.timeSeriesData['upload_error_rates']), label='Upload Error Rate', color='red', linewidth=2)
+            ax2.plot(*decimate_series(dates, self.timeSeriesData['download_error_rates']), label='Download Error Rate', color='orange', linewidth=2)
             ax2.set_ylabel('Error Rate (%)')
             ax2.legend()
         
@@ -866,21 +1172,48 @@ class MainWindow(QMainWindow):
             ax2.set_xlabel('Date')
             ax2.set_title('Transfer Ratios Over Time')
             ax2.grid(True, alpha=0.3)
+            self.formatDateAxis(ax2, len(dates))
             
-            # Format x-axis dates
-            if len(dates) > 30:
-                ax2.xaxis.set_major_locator(mdates.WeekdayLocator())
-                ax2.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d'))
-            else:
-                ax2.xaxis.set_major_locator(mdates.DayLocator())
-                ax2.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d'))
-        
-        self.ratiosFigure.autofmt_xdate()
-        self.ratiosFigure.tight_layout()
+            # Only lay out when something is plotted, a hidden axes just needs repainting
+            self.ratiosFigure.autofmt_xdate()
+            self.ratiosFigure.tight_layout()
         
-        # Refresh canvases
-        self.amountsCanvas.draw()
-        self.ratiosCanvas.draw()
+        # Refresh canvases, draw_idle lets Qt coalesce the repaint
+        self.amountsCanvas.draw_idle()
+        self.ratiosCanvas.draw_idle()
+    
+    def formatDateAxis(self, ax, date_count):
+        """Tick the x-axis weekly for long ranges and daily otherwise"""
+        week_locator, day_locator, date_formatter = self.dateTickers[ax]
+        ax.xaxis.set_major_locator(week_locator if date_count > 30 else day_locator)
+        ax.xaxis.set_major_formatter(date_formatter)
+    
+    def removeRatiosTwinAxes(self):
+        """Drop the error rate axis that is only added when both ratio metrics are shown"""
+        if self.ratiosTwinAxes is not None:
+            self.ratiosTwinAxes.remove()
+            self.ratiosTwinAxes = None
+    
+    def applyAmountLineVisibility(self, ax):
+        """Show the checked amount lines, rescale to them and rebuild the legend"""
+        visible_lines = []
+        for checkbox, line in self.amountLines:
+            line.set_visible(checkbox.isChecked())
+            if checkbox.isChecked():
+                visible_lines.append(line)
+        ax.relim(visible_only=True)
+        ax.autoscale_view()
+        if visible_lines:
+            ax.legend(visible_lines, [line.get_label() for line in visible_lines])
+        elif ax.get_legend():
+            ax.get_legend().remove()
+    
+    def toggleAmountLines(self):
+        # Nothing plotted yet, the next redraw applies the checkbox states
+        if not self.amountLines:
+            return
+        self.applyAmountLineVisibility(self.amountsAxes)
+        self.amountsCanvas.draw_idle()
     
     def format_amounts_tooltip(self, sel, lines):
         """Format tooltip for amounts graph - disabled"""
@@ -890,167 +1223,198 @@ class MainWindow(QMainWindow):
         """Format tooltip for ratios graph - disabled"""
         pass
     
+    def periodDays(self):
+        """Convert the period selection to a number of days, None for all time"""
+        period_text = self.periodComboBox.currentText()
+        if period_text == "Last month":
+            return 30
+        elif period_text == "Last year":
+            return 365
+        return None
+
     def analyzeTransfers(self):
         if not self.db_paths:
             QMessageBox.warning(self, "No Database Files",
                                "Please add at least one database file to analyze.")
             return
 
-        # Convert period selection to days
-        period_text = self.periodComboBox.currentText()
-        if period_text == "All time":
-            days = None
-        elif period_text == "Last month":
-            days = 30
-        elif period_text == "Last year":
-            days = 365
-        else:
-            days = None
-        top_n = 10  # Fixed value since we removed the spinbox
+        days = self.periodDays()
 
         # Always show both upload and download stats
         show_uploads = True
         show_downloads = True
 
-        # Clear previous results
-        self.uploadSummary.clear()
-        self.downloadSummary.clear()
-        self.uploadUsersTable.setRowCount(0)
-        self.downloadUsersTable.setRowCount(0)
-        self.uploadTypesTable.setRowCount(0)
-        self.downloadTypesTable.setRowCount(0)
-
-        # Get stats and update UI
-        upload_stats = get_transfer_stats(self.db_paths, "Upload", days)
-        if upload_stats["total_transfers"] > 0:
-            stats_text = "\n".join([
-                f"Total Uploads: {upload_stats['total_transfers']}",
-                f"Total Data Uploaded: {format_size(upload_stats['total_bytes'])}",
-                f"Unique Users: {upload_stats['unique_users']}",
-                f"Average Upload Speed: {format_size(upload_stats['avg_speed'])}/s",
-                f"Average Upload Duration: {format_time(upload_stats['avg_duration'])}",
-                f"Error Rate: {upload_stats['error_rate']:.2f}% ({upload_stats['errors']} of {upload_stats['total_attempts']})"
-            ])
-            self.uploadSummary.setText(stats_text)
+        # Compute the date cutoff once for every query in this analysis
+        cutoff_date = None
+        if days:
+            cutoff_date = (datetime.date.today() - datetime.timedelta(days=days)).isoformat()
 
-            # Update tables
-            sorted_users = sorted(
-                upload_stats["user_stats"].items(),
-                key=lambda x: x[1]["bytes"],
-                reverse=True
-            )
-            self.populateTable(self.uploadUsersTable, sorted_users, top_n)
+        # Reuse the previous results if no database changed since they were computed
+        stats_key = (database_signature(self.db_paths), cutoff_date)
+        if stats_key in self._stats_cache:
+            self.showStats(*self._stats_cache[stats_key])
+            return
 
-            sorted_extensions = sorted(
-                upload_stats["extension_stats"].items(),
-                key=lambda x: x[1]["bytes"],
-                reverse=True
-            )
-            self.populateTable(self.uploadTypesTable, sorted_extensions, top_n)
-        else:
-            self.uploadSummary.setText("No upload data found for the specified period.")
+        # Run the queries off the GUI thread, results come back through onStatsReady.
+        # The database buttons stay disabled since the worker uses the pooled connections.
+        self.analyzeButton.setEnabled(False)
+        self.addDbButton.setEnabled(False)
+        self.clearDbButton.setEnabled(False)
+        self.progressBar.setRange(0, 3 * len(self.db_paths) + 1)
+        self.progressBar.setValue(0)
+        self.progressBar.setVisible(True)
+        self._statsWorker = StatsWorker(self.db_paths, cutoff_date, days, self._conn_caches)
+        self._statsWorker.signals.progress.connect(self.onStatsProgress)
+        self._statsWorker.signals.finished.connect(self.onStatsReady)
+        self._statsWorker.signals.error.connect(self.onStatsError)
+        QThreadPool.globalInstance().start(self._statsWorker)
 
-        download_stats = get_transfer_stats(self.db_paths, "Download", days)
-        if download_stats["total_transfers"] > 0:
-            stats_text = "\n".join([
-                f"Total Downloads: {download_stats['total_transfers']}",
-                f"Total Data Downloaded: {format_size(download_stats['total_bytes'])}",
-                f"Unique Users: {download_stats['unique_users']}",
-                f"Average Download Speed: {format_size(download_stats['avg_speed'])}/s",
-                f"Average Download Duration: {format_time(download_stats['avg_duration'])}",
-                f"Error Rate: {download_stats['error_rate']:.2f}% ({download_stats['errors']} of {download_stats['total_attempts']})"
-            ])
-            self.downloadSummary.setText(stats_text)
+    def onStatsProgress(self, done, total):
+        self.progressBar.setRange(0, total)
+        self.progressBar.setValue(done)
 
-            # Update tables
-            sorted_users = sorted(
-                download_stats["user_stats"].items(),
-                key=lambda x: x[1]["bytes"],
-                reverse=True
-            )
-            self.populateTable(self.downloadUsersTable, sorted_users, top_n)
+    def onStatsReady(self, stats_key, upload_stats, download_stats, time_series, popularity):
+        if self.isStaleResult():
+            return
+        # Results missing a database that failed to read (locked, say) are not cached,
+        # so the next click runs the queries again instead of replaying the failure
+        if not self._statsWorker.errors:
+            self._stats_cache[stats_key] = (upload_stats, download_stats, time_series, popularity)
+            if len(self._stats_cache) > 8:
+                # Drop the oldest entry, its databases have most likely changed since
+                del self._stats_cache[next(iter(self._stats_cache))]
+        self.showStats(upload_stats, download_stats, time_series, popularity)
+        self.finishAnalysis()
 
-            sorted_extensions = sorted(
-                download_stats["extension_stats"].items(),
-                key=lambda x: x[1]["bytes"],
-                reverse=True
-            )
-            self.populateTable(self.downloadTypesTable, sorted_extensions, top_n)
-        else:
-            self.downloadSummary.setText("No download data found for the specified period.")
+    def showStats(self, upload_stats, download_stats, time_series, popularity):
+        self.showTransferStats("Upload", upload_stats)
+        self.showTransferStats("Download", download_stats)
         
-        # Get time series data and update graphs
-        self.timeSeriesData = get_time_series_data(self.db_paths, days)
+        # Update graphs with the time series data
+        self.timeSeriesData = time_series
         self.updateGraphs()
         
         # Update popularity stats
+        self.popularityData = popularity
         self.updatePopularityStats()
+
+    def onStatsError(self, message):
+        if self.isStaleResult():
+            return
+        self.finishAnalysis()
+        QMessageBox.critical(self, "Analysis Failed", f"Error while analyzing transfers: {message}")
+
+    def isStaleResult(self):
+        """Check if a worker signal comes from an analysis that was stopped since"""
+        return self._statsWorker is None or self.sender() is not self._statsWorker.signals
+
+    def stopAnalysis(self):
+        """Cancel the running analysis and wait for its worker to return"""
+        if self._statsWorker is None:
+            return
+        # The jobs stop before their next database or query once the event is set, so only
+        # the statements running right now are left. interrupt() is safe to call from
+        # another thread and makes those fail early.
+        self._statsWorker.cancelled.set()
+        for conn_cache in self._conn_caches.values():
+            for conn, _ in list(conn_cache.values()):
+                conn.interrupt()
+        QThreadPool.globalInstance().waitForDone()
+        # Signals still queued from the worker are dropped once it is forgotten
+        self.finishAnalysis()
+
+    def finishAnalysis(self):
+        self._statsWorker = None
+        self.progressBar.setVisible(False)
+        self.analyzeButton.setEnabled(True)
+        self.addDbButton.setEnabled(True)
+        self.clearDbButton.setEnabled(True)
+
+    def showTransferStats(self, direction, stats):
+        top_n = 10  # Fixed value since we removed the spinbox
+
+        if direction == "Upload":
+            summary, users_table, types_table = self.uploadSummary, self.uploadUsersTable, self.uploadTypesTable
+        else:
+            summary, users_table, types_table = self.downloadSummary, self.downloadUsersTable, self.downloadTypesTable
+
+        if stats["total_transfers"] > 0:
+            stats_text = "\n".join([
+                f"Total {direction}s: {stats['total_transfers']}",
+                f"Total Data {direction}ed: {format_size(stats['total_bytes'])}",
+                f"Unique Users: {stats['unique_users']}",
+                f"Average {direction} Speed: {format_size(stats['avg_speed'])}/s",
+                f"Average {direction} Duration: {format_time(stats['avg_duration'])}",
+                f"Error Rate: {stats['error_rate']:.2f}% ({stats['errors']} of {stats['total_attempts']})"
+            ])
+            summary.setText(stats_text)
+
+            # Update tables
+            sorted_users = stats["user_bytes"].most_common(top_n)
+            self.setTableRows(users_table, [(user, stats["user_counts"][user], total_bytes)
+                                            for user, total_bytes in sorted_users])
+
+            sorted_extensions = stats["extension_bytes"].most_common(top_n)
+            self.setTableRows(types_table, [(ext, stats["extension_counts"][ext], total_bytes)
+                                            for ext, total_bytes in sorted_extensions])
+        else:
+            summary.setText(f"No {direction.lower()} data found for the specified period.")
+            self.setTableRows(users_table, [])
+            self.setTableRows(types_table, [])
         
     def updatePopularityStats(self):
-        if not self.db_paths:
+        # Popularity data is gathered by the analysis worker, this only renders it
+        if not self.popularityData:
             return
             
-        # Get current period setting
-        period_text = self.periodComboBox.currentText()
-        if period_text == "All time":
-            days = None
-        elif period_text == "Last month":
-            days = 30
-        elif period_text == "Last year":
-            days = 365
-        else:
-            days = None
-            
         top_n = self.topEntriesSpinBox.value()
         
-        # Analyze library format first
-        format_info = analyze_library_format(self.db_paths)
-        
-        # Get popularity data
-        artist_stats, album_stats = get_popularity_stats(self.db_paths, days)
+        format_info = self.popularityData['format_info']
+        artist_counts = self.popularityData['artist_counts']
+        artist_bytes = self.popularityData['artist_bytes']
+        album_counts = self.popularityData['album_counts']
+        album_bytes = self.popularityData['album_bytes']
         
         # Check if we have data and good format compatibility
-        if not artist_stats and not album_stats:
+        if not artist_counts and not album_counts:
             self.showPopularityError("No successful upload transfers found.", format_info)
             return
         elif format_info['match_percentage'] < 50:
             self.showPopularityWarning(format_info)
         
+        # Sort by transfer count once for both the table and the chart
+        sorted_artists = artist_counts.most_common(top_n)
+        sorted_albums = album_counts.most_common(top_n)
+        
         # Update artists table and chart
-        self.updateArtistsTable(artist_stats, top_n)
-        self.updateArtistsChart(artist_stats, top_n)
+        self.updateArtistsTable(sorted_artists, artist_bytes)
+        self.updateArtistsChart(sorted_artists)
         
         # Update albums table and chart
-        self.updateAlbumsTable(album_stats, top_n)
-        self.updateAlbumsChart(album_stats, top_n)
-        
-    def updateArtistsTable(self, artist_stats, top_n):
-        # Sort by transfer count
-        sorted_artists = sorted(artist_stats.items(), key=lambda x: x[1]['count'], reverse=True)[:top_n]
-        
-        self.artistsTable.setRowCount(len(sorted_artists))
-        for i, (artist, stats) in enumerate(sorted_artists):
-            self.artistsTable.setItem(i, 0, QTableWidgetItem(artist))
-            self.artistsTable.setItem(i, 1, QTableWidgetItem(str(stats['count'])))
-            self.artistsTable.setItem(i, 2, QTableWidgetItem(format_size(stats['bytes'])))
+        self.updateAlbumsTable(sorted_albums, album_bytes)
+        self.updateAlbumsChart(sorted_albums)
+        
+    def updateArtistsTable(self, sorted_artists, artist_bytes):
+        self.setTableRows(self.artistsTable, [(artist, count, artist_bytes[artist])
+                                              for artist, count in sorted_artists])
             
-    def updateArtistsChart(self, artist_stats, top_n):
+    def updateArtistsChart(self, sorted_artists):
         self.artistsFigure.clear()
-        if not artist_stats:
-            self.artistsCanvas.draw()
+        self.artistsHover = ([], [], [])
+        if not sorted_artists:
+            self.artistsCanvas.draw_idle()
             return
             
-        # Sort by transfer count
-        sorted_artists = sorted(artist_stats.items(), key=lambda x: x[1]['count'], reverse=True)[:top_n]
-        
         ax = self.artistsFigure.add_subplot(111)
-        artists = [item[0] for item in sorted_artists]
-        counts = [item[1]['count'] for item in sorted_artists]
         
-        # Truncate long artist names for display
+        # Collect names, counts and truncated display names in one pass
         max_name_length = 25
+        artists = []
+        counts = []
         truncated_artists = []
-        for artist in artists:
+        for artist, count in sorted_artists:
+            artists.append(artist)
+            counts.append(count)
             if len(artist) > max_name_length:
                 truncated_artists.append(artist[:max_name_length-3] + "...")
             else:
@@ -1064,9 +1428,7 @@ class MainWindow(QMainWindow):
         ax.set_title(f'Top {len(artists)} Artists by Downloads')
         
         # Add value labels on bars
-        for i, (bar, count) in enumerate(zip(bars, counts)):
-            ax.text(bar.get_width() + max(counts) * 0.01, bar.get_y() + bar.get_height()/2, 
-                   str(count), ha='left', va='center', fontsize=8)
+        ax.bar_label(bars, labels=[str(count) for count in counts], padding=3, fontsize=8)
         
         # Expand x-axis to accommodate labels
         ax.set_xlim(0, max(counts) * 1.15)
@@ -1074,57 +1436,47 @@ class MainWindow(QMainWindow):
         ax.grid(axis='x', alpha=0.3)
         self.artistsFigure.tight_layout()
         
-        # Add custom hover functionality
-        self.artistsCanvas.mpl_connect('motion_notify_event', 
-            lambda event: self.onArtistHover(event, bars, artists, counts))
-        
-        self.artistsCanvas.draw()
+        # Hover handler is connected once, it only needs the current bars
+        self.artistsHover = (bars, artists, counts)
         
-    def updateAlbumsTable(self, album_stats, top_n):
-        # Sort by transfer count
-        sorted_albums = sorted(album_stats.items(), key=lambda x: x[1]['count'], reverse=True)[:top_n]
+        self.artistsCanvas.draw_idle()
         
-        self.albumsTable.setRowCount(len(sorted_albums))
-        for i, (album_key, stats) in enumerate(sorted_albums):
-            artist, album = album_key
-            self.albumsTable.setItem(i, 0, QTableWidgetItem(artist))
-            self.albumsTable.setItem(i, 1, QTableWidgetItem(album))
-            self.albumsTable.setItem(i, 2, QTableWidgetItem(str(stats['count'])))
-            self.albumsTable.setItem(i, 3, QTableWidgetItem(format_size(stats['bytes'])))
+    def updateAlbumsTable(self, sorted_albums, album_bytes):
+        self.setTableRows(self.albumsTable, [(artist, album, count, album_bytes[(artist, album)])
+                                             for (artist, album), count in sorted_albums])
             
-    def updateAlbumsChart(self, album_stats, top_n):
+    def updateAlbumsChart(self, sorted_albums):
         self.albumsFigure.clear()
-        if not album_stats:
-            self.albumsCanvas.draw()
+        self.albumsHover = ([], [], [])
+        if not sorted_albums:
+            self.albumsCanvas.draw_idle()
             return
             
-        # Sort by transfer count
-        sorted_albums = sorted(album_stats.items(), key=lambda x: x[1]['count'], reverse=True)[:top_n]
-        
         ax = self.albumsFigure.add_subplot(111)
-        album_labels = [item[0][1] for item in sorted_albums]  # Just album name, not artist
-        counts = [item[1]['count'] for item in sorted_albums]
         
-        # Truncate long album labels for display
+        # Collect counts, truncated album names (not artist) for display and
+        # full artist-album info for hover tooltips in one pass
         max_label_length = 30
+        counts = []
         truncated_labels = []
-        for label in album_labels:
-            if len(label) > max_label_length:
-                truncated_labels.append(label[:max_label_length-3] + "...")
+        full_album_labels = []
+        for (artist, album), count in sorted_albums:
+            counts.append(count)
+            if len(album) > max_label_length:
+                truncated_labels.append(album[:max_label_length-3] + "...")
             else:
-                truncated_labels.append(label)
+                truncated_labels.append(album)
+            full_album_labels.append(f"{artist} - {album}")
         
         # Create horizontal bar chart
         bars = ax.barh(range(len(truncated_labels)), counts)
         ax.set_yticks(range(len(truncated_labels)))
         ax.set_yticklabels(truncated_labels, fontsize=7)
         ax.set_xlabel('Downloads')
-        ax.set_title(f'Top {len(album_labels)} Albums by Downloads')
+        ax.set_title(f'Top {len(counts)} Albums by Downloads')
         
         # Add value labels on bars
-        for i, (bar, count) in enumerate(zip(bars, counts)):
-            ax.text(bar.get_width() + max(counts) * 0.01, bar.get_y() + bar.get_height()/2, 
-                   str(count), ha='left', va='center', fontsize=7)
+        ax.bar_label(bars, labels=[str(count) for count in counts], padding=3, fontsize=7)
         
         # Expand x-axis to accommodate labels
         ax.set_xlim(0, max(counts) * 1.15)
@@ -1135,53 +1487,38 @@ class MainWindow(QMainWindow):
         except:
             pass  # Ignore tight_layout warnings for long album names
         
-        # Add custom hover functionality (pass full artist-album info for tooltips)
-        full_album_labels = [f"{item[0][0]} - {item[0][1]}" for item in sorted_albums]
-        self.albumsCanvas.mpl_connect('motion_notify_event', 
-            lambda event: self.onAlbumHover(event, bars, full_album_labels, counts))
+        self.albumsHover = (bars, full_album_labels, counts)
         
-        self.albumsCanvas.draw()
+        self.albumsCanvas.draw_idle()
         
-    def onArtistHover(self, event, bars, artists, counts):
+    def onArtistHover(self, event):
         """Handle hover events on artist chart bars"""
-        if event.inaxes is None:
-            self.artistsCanvas.setToolTip("")
-            return
-            
-        for i, bar in enumerate(bars):
-            if bar.contains(event)[0]:
-                # Show tooltip with full artist name and count
-                tooltip_text = f"{artists[i]}\n{counts[i]} downloads"
-                self.artistsCanvas.setToolTip(tooltip_text)
-                return
-        
-        # Clear tooltip when not hovering over a bar
-        self.artistsCanvas.setToolTip("")
-        
-    def onAlbumHover(self, event, bars, album_labels, counts):
+        bars, artists, counts = self.artistsHover
+        i = hovered_bar_index(event, bars, counts)
+        # Show tooltip with full artist name and count, clear it when not hovering over a bar
+        tooltip_text = f"{artists[i]}\n{counts[i]} downloads" if i is not None else ""
+        if self.artistsCanvas.toolTip() != tooltip_text:
+            self.artistsCanvas.setToolTip(tooltip_text)
+        
+    def onAlbumHover(self, event):
         """Handle hover events on album chart bars"""
-        if event.inaxes is None:
-            self.albumsCanvas.setToolTip("")
-            return
-            
-        for i, bar in enumerate(bars):
-            if bar.contains(event)[0]:
-                # Show tooltip with full album name and count
-                tooltip_text = f"{album_labels[i]}\n{counts[i]} downloads"
-                self.albumsCanvas.setToolTip(tooltip_text)
-                return
-        
-        # Clear tooltip when not hovering over a bar
-        self.albumsCanvas.setToolTip("")
+        bars, album_labels, counts = self.albumsHover
+        i = hovered_bar_index(event, bars, counts)
+        # Show tooltip with full album name and count, clear it when not hovering over a bar
+        tooltip_text = f"{album_labels[i]}\n{counts[i]} downloads" if i is not None else ""
+        if self.albumsCanvas.toolTip() != tooltip_text:
+            self.albumsCanvas.setToolTip(tooltip_text)
         
     def showPopularityError(self, message, format_info):
         """Show error message and clear popularity displays"""
         # Clear tables and charts
-        self.artistsTable.setRowCount(0)
-        self.albumsTable.setRowCount(0)
+        self.setTableRows(self.artistsTable, [])
+        self.setTableRows(self.albumsTable, [])
         
         self.artistsFigure.clear()
         self.albumsFigure.clear()
+        self.artistsHover = ([], [], [])
+        self.albumsHover = ([], [], [])
         
         # Show explanatory text in charts
         self.showPopularityExplanation(self.artistsFigure, self.artistsCanvas, message, format_info)
@@ -1230,9 +1567,36 @@ Check if your files are in media folders like /music/ or /audiobooks/"""
                 fontsize=9, verticalalignment='top', fontfamily='monospace',
                 bbox=dict(boxstyle="round,pad=0.5", facecolor="lightgray", alpha=0.8))
         
-        canvas.draw()
+        canvas.draw_idle()
+
+def decimate_series(dates, values, max_points=MAX_PLOT_POINTS):
+    """Thin a long series for plotting, keeping the minimum and maximum of each bucket"""
+    count = len(values)
+    if count <= max_points:
+        return dates, values
+    # Buckets of step points contribute two points each, the partial tail is kept as is.
+    # The first and last points are always kept so the line spans the whole date range.
+    step = -(-2 * count // max_points)
+    full = count - count % step
+    buckets = values[:full].reshape(-1, step)
+    starts = np.arange(0, full, step)
+    indexes = np.unique(np.concatenate(([0, count - 1],
+                                        starts + buckets.argmin(axis=1),
+                                        starts + buckets.argmax(axis=1),
+                                        np.arange(full, count))))
+    return dates[indexes], values[indexes]
 
-def analyze_library_format(db_paths):
+def hovered_bar_index(event, bars, counts):
+    """Return the index of the horizontal bar under the mouse, or None"""
+    # Bars are drawn by barh at integer y positions starting from 0
+    if event.inaxes is None or event.xdata is None or event.ydata is None or not bars:
+        return None
+    i = int(round(event.ydata))
+    if 0 <= i < len(bars) and abs(event.ydata - i) <= bars[i].get_height() / 2 and 0 <= event.xdata <= counts[i]:
+        return i
+    return None
+
+def analyze_library_format(db_paths, conn_cache=None, errors=None, cancelled=None):
     """Analyze the library format using smart left-to-right parsing"""
     total_files = 0
     matching_files = 0
@@ -1240,46 +1604,40 @@ def analyze_library_format(db_paths):
     format_examples = []
     
     for db_path in db_paths:
+        check_cancelled(cancelled)
         try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+            with stats_connection(db_path, conn_cache) as (conn, db_format):
+                cursor = conn.cursor()
             
-            # Detect database format
-            db_format = check_database_format(db_path)
+                success_condition = STATE_CONDITIONS[db_format]['success']
             
-            if db_format == 'new':
-                success_condition = "StateDescription='Completed, Succeeded'"
-            else:
-                success_condition = "State LIKE 'Completed, Succeeded'"
-            
-            # Get a sample of successful upload filenames
-            cursor.execute(f"""
-                SELECT Filename 
-                FROM Transfers 
-                WHERE {success_condition} AND Direction = 'Upload' AND Filename IS NOT NULL
-                LIMIT 200
-            """)
+                # Get a sample of successful upload filenames
+                cursor.execute(f"""
+                    SELECT Filename 
+                    FROM Transfers 
+                    WHERE {success_condition} AND Direction = 'Upload' AND Filename IS NOT NULL
+                    LIMIT 200
+                """)
             
-            rows = cursor.fetchall()
-            for (filename,) in rows:
-                total_files += 1
-                sample_paths.append(filename)
+                for (filename,) in cursor:
+                    total_files += 1
+                    sample_paths.append(filename)
                 
-                # Use smart parsing to extract artist/album
-                artist, album = parse_media_path(filename)
-                if artist and album:
-                    matching_files += 1
-                    # Keep some examples for display
-                    if len(format_examples) < 10:
-                        format_examples.append({
-                            'path': filename,
-                            'artist': artist,
-                            'album': album
-                        })
+                    # Use smart parsing to extract artist/album
+                    artist, album = parse_media_path(filename)
+                    if artist and album:
+                        matching_files += 1
+                        # Keep some examples for display
+                        if len(format_examples) < 10:
+                            format_examples.append({
+                                'path': filename,
+                                'artist': artist,
+                                'album': album
+                            })
             
-            conn.close()
-            
-        except sqlite3.Error:
+        except sqlite3.Error as e:
+            if errors is not None:
+                errors.append(f"{db_path}: {e}")
             continue
     
     match_percentage = (matching_files / total_files * 100) if total_files > 0 else 0
@@ -1296,22 +1654,15 @@ def parse_media_path(filepath):
     if not filepath:
         return None, None
     
-    # Normalize path separators (handle both single and double backslashes)
-    normalized_path = filepath.replace('\\\\', '/').replace('\\', '/')
+    # Normalize path separators, doubled backslashes leave empty parts that are dropped below
+    normalized_path = filepath.replace('\\', '/')
     lower_path = normalized_path.lower()
     
-    # Find potential media indicators (case insensitive)
-    media_indicators = [
-        '/music/', '/audiobooks/', '/audio/', '/media/',
-        '/artists/', '/musica/', '/jazz/', '/rock/', '/electronic/',
-        'music/', 'artists/', 'musica/', 'jazz/', 'albums/'
-    ]
-    
     path_parts = []
     
-    # Try to find a media root
+    # Try to find a media root (case insensitive)
     media_start_idx = -1
-    for indicator in media_indicators:
+    for indicator in MEDIA_INDICATORS:
         idx = lower_path.find(indicator)
         if idx >= 0:
             media_start_idx = idx + len(indicator)
@@ -1328,20 +1679,14 @@ def parse_media_path(filepath):
         
         # Filter out common system/user prefixes
         filtered_parts = []
-        skip_patterns = ['@@', '!', '#', 'my files', 'downloads', 'shared', 'soulseek', 'main']
         
         for part in all_parts:
-            part_lower = part.lower()
-            should_skip = False
-            for pattern in skip_patterns:
-                if part_lower.startswith(pattern):
-                    should_skip = True
-                    break
             # Also skip parts that look like disk/volume identifiers
             if len(part) <= 2 or part.isdigit() or (len(part) < 8 and any(c in part for c in '-_0123456789')):
-                should_skip = True
-            if not should_skip:
-                filtered_parts.append(part)
+                continue
+            if part.lower().startswith(SKIP_PREFIXES):
+                continue
+            filtered_parts.append(part)
         
         # Take meaningful parts (likely Artist/Album/File or Genre/Artist/Album/File)
         if len(filtered_parts) >= 3:
@@ -1366,6 +1711,7 @@ def parse_media_path(filepath):
     
     return artist, cleaned_album
 
+@lru_cache(maxsize=4096)
 def clean_album_name(artist, album):
     """Enhanced album name cleaning with common prefix removal"""
     if not artist or not album:
@@ -1374,15 +1720,14 @@ def clean_album_name(artist, album):
     artist_lower = artist.lower().strip()
     album_lower = album.lower().strip()
     
-    # Enhanced patterns to clean (more comprehensive)
-    separators = [' - ', ' – ', ' — ', ': ', ' : ', '_ ', ' _ ', ' | ', ' / ']
-    
     cleaned_album = album
-    for sep in separators:
-        pattern = f"{artist_lower}{sep}"
-        if album_lower.startswith(pattern):
-            cleaned_album = album[len(pattern):]
-            break
+    # Both patterns below need the album to start with the artist name
+    if album_lower.startswith(artist_lower):
+        for sep in ALBUM_SEPARATORS:
+            pattern = f"{artist_lower}{sep}"
+            if album_lower.startswith(pattern):
+                cleaned_album = album[len(pattern):]
+                break
     
     # Additional cleanup patterns
     if cleaned_album == album:  # No separator match, try other patterns
@@ -1406,62 +1751,63 @@ def clean_album_name(artist, album):
     
     return cleaned_album
 
-def get_popularity_stats(db_paths, days=None):
+def get_popularity_stats(db_paths, days=None, conn_cache=None, errors=None, cancelled=None):
     """Get artist and album popularity statistics from successful transfers"""
-    artist_stats = defaultdict(lambda: {'count': 0, 'bytes': 0})
-    album_stats = defaultdict(lambda: {'count': 0, 'bytes': 0})
+    # Counts and bytes are kept as parallel Counters keyed by artist and (artist, album)
+    artist_counts = Counter()
+    artist_bytes = Counter()
+    album_counts = Counter()
+    album_bytes = Counter()
+    
+    # Time filter is the same for every database, so the cutoff is computed once
+    date_filter = ""
+    params = ()
+    if days is not None:
+        date_filter = " AND RequestedAt >= ?"
+        params = ((datetime.datetime.now() - datetime.timedelta(days=days)).isoformat(),)
     
     for db_path in db_paths:
+        check_cancelled(cancelled)
         try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+            with stats_connection(db_path, conn_cache) as (conn, db_format):
+                cursor = conn.cursor()
             
-            # Detect database format
-            db_format = check_database_format(db_path)
+                success_condition = STATE_CONDITIONS[db_format]['success']
             
-            if db_format == 'new':
-                success_condition = "StateDescription='Completed, Succeeded'"
-            else:
-                success_condition = "State LIKE 'Completed, Succeeded'"
+                # Create WHERE clause for time filtering
+                where_clause = f"WHERE {success_condition} AND Direction = 'Upload'{date_filter}"  # Track what users upload/share
             
-            # Create WHERE clause for time filtering
-            where_clause = f"WHERE {success_condition} AND Direction = 'Upload'"  # Track what users upload/share
-            params = []
-    
-            if days is not None:
-                where_clause += " AND RequestedAt >= ?"
-                cutoff_date = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
-                params.append(cutoff_date)
+                # Aggregate repeated uploads of the same file in SQL so each path is parsed once
+                query = f"""
+                    SELECT Filename, COUNT(*), SUM(Size) 
+                    FROM Transfers 
+                    {where_clause}
+                    GROUP BY Filename
+                """
             
-            query = f"""
-                SELECT Filename, Size 
-                FROM Transfers 
-                {where_clause}
-            """
+                cursor.execute(query, params)
             
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            
-            for filename, size in rows:
-                # Use smart left-to-right parsing to extract artist and album
-                artist, album = parse_media_path(filename)
-                if artist and album:
-                    # Update artist stats
-                    artist_stats[artist]['count'] += 1
-                    artist_stats[artist]['bytes'] += size
+                # Stream rows instead of materializing every successful upload
+                for filename, count, size in cursor:
+                    # Use smart left-to-right parsing to extract artist and album
+                    artist, album = parse_media_path(filename)
+                    if artist and album:
+                        # Update artist stats
+                        artist_counts[artist] += count
+                        artist_bytes[artist] += size
                     
-                    # Update album stats
-                    album_key = (artist, album)
-                    album_stats[album_key]['count'] += 1
-                    album_stats[album_key]['bytes'] += size
-            
-            conn.close()
+                        # Update album stats
+                        album_key = (artist, album)
+                        album_counts[album_key] += count
+                        album_bytes[album_key] += size
             
         except sqlite3.Error as e:
             print(f"Database error for {db_path}: {e}")
+            if errors is not None:
+                errors.append(f"{db_path}: {e}")
             continue
     
-    return dict(artist_stats), dict(album_stats)
+    return artist_counts, artist_bytes, album_counts, album_bytes
 
 def main():
     # Launch GUI application